@@ -1,26 +1,90 @@
+import os
 import re
-import csv
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
 
-
-def _parse_insert_blocks(sql_text: str, table: str) -> List[Dict]:
-    """Extract INSERT blocks for a table and return list of dict rows."""
-    # Find INSERT ... (col1, col2, ...) VALUES (...),(...); blocks for the table
-    pattern = re.compile(r"INSERT INTO `" + re.escape(table) + r"`\s*\(([^)]+)\)\s*VALUES\s*(.*?);",
-                         re.IGNORECASE | re.DOTALL)
-    rows = []
-    for match in pattern.finditer(sql_text):
-        cols_raw, values_raw = match.groups()
-        cols = [c.strip().strip('`') for c in cols_raw.split(',')]
-
-        # Find each parenthesized tuple (non-greedy)
-        tuples = re.findall(r"\(([^)]*)\)", values_raw, re.DOTALL)
-        for tup in tuples:
-            # Use csv reader with single-quote quoting to split values robustly
-            reader = csv.reader([tup], delimiter=',', quotechar="'", skipinitialspace=True)
-            parsed = next(reader)
-            parsed = [_convert_sql_value(v) for v in parsed]
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # pyarrow is optional; name columns then keep pandas' default string dtype
+    _NAME_DTYPE = None
+else:
+    # Arrow-backed strings with NaN (not pd.NA) for missing values, so comparisons still give
+    # plain bool masks. This is pandas 3's default string dtype; pandas < 2.3 has no `na_value`
+    # and spells it 'pyarrow_numpy' (2.1/2.2), and older releases just keep object columns.
+    try:
+        _NAME_DTYPE = pd.StringDtype('pyarrow', na_value=np.nan)
+    except TypeError:
+        try:
+            _NAME_DTYPE = pd.StringDtype('pyarrow_numpy')
+        except ValueError:
+            _NAME_DTYPE = None
+
+try:
+    import re2 as _insert_re_engine  # linear-time DFA matching for the INSERT scan
+except ImportError:  # google-re2 is optional; the stdlib engine handles the same pattern
+    _insert_re_engine = re
+
+try:
+    from numba import njit
+    _HAVE_NUMBA = True
+except ImportError:  # numba is optional; the tokenizer then runs as plain Python
+    _HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+
+# Compiled once at import time; the parse loop below runs these per tuple/token.
+# Inline flags keep the INSERT pattern valid for both `re` and `re2`.
+_INSERT_RE = _insert_re_engine.compile(rb"(?is)INSERT INTO `([^`]+)`\s*\(([^)]+)\)\s*VALUES\s*(.*?);")
+_SQL_ESCAPES = {'n': '\n', 'r': '\r', 't': '\t', '0': '\0'}
+_ESCAPE_RE = re.compile(r"\\(.)|''", re.DOTALL)
+_INT_RE = re.compile(r"-?\d+")
+_FLOAT_RE = re.compile(r"-?\d+\.\d+")
+
+# Non-party columns of the results DataFrame, in output order; every other column is a party
+_INFO_COLUMNS = ['polling_unit_uniqueid', 'polling_unit_name', 'polling_unit_number', 'ward_id', 'lga_id', 'ward_name', 'lga_name', 'state_id', 'state_name']
+
+# Bump whenever parsing or `build_polling_unit_results_df` output changes, so stale
+# Parquet caches written by older code are rebuilt instead of served
+_RESULTS_CACHE_VERSION = 2
+
+# sql_path -> ((mtime_ns, size), INSERT rows of the last requested tables) for `_parse_table_inserts`
+_SQL_ROWS_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, List[Dict]]]] = {}
+
+
+def _parse_inserts(sql_bytes: bytes, tables: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+    """Extract INSERT blocks in one pass over the dump and return dict rows per table.
+
+    Only tables in `tables` are decoded (all tables if None); every requested table is
+    present in the result, with an empty list if the dump has no rows for it.
+    """
+    wanted = None if tables is None else set(tables)
+    result: Dict[str, List[Dict]] = {t: [] for t in tables} if tables is not None else {}
+    # numba needs a uint8 array; the pure-Python fallback scans the bytes object directly
+    buf = np.frombuffer(sql_bytes, dtype=np.uint8) if _HAVE_NUMBA else sql_bytes
+    # Find INSERT INTO `table` (col1, col2, ...) VALUES (...),(...); blocks
+    for match in _INSERT_RE.finditer(sql_bytes):
+        table = match.group(1).decode('ascii', 'ignore')
+        if wanted is not None and table not in wanted:
+            continue
+        rows = result.setdefault(table, [])
+        cols = [c.strip().strip('`') for c in match.group(2).decode('ascii', 'ignore').split(',')]
+
+        # Scan the VALUES body in place and decode only the individual field slices
+        row_ends, field_starts, field_ends, field_quoted = (a.tolist() for a in _scan_values(buf, match.start(3), match.end(3)))
+        first = 0
+        for last in row_ends:
+            parsed = []
+            for k in range(first, last):
+                token = sql_bytes[field_starts[k]:field_ends[k]].decode('utf-8', 'ignore').strip()
+                if field_quoted[k]:
+                    token = _unquote_sql_string(token)
+                parsed.append(_convert_sql_value(token))
+            first = last
             # If number of values doesn't match columns, skip
             if len(parsed) != len(cols):
                 # fallback: pad or truncate conservatively
@@ -29,38 +93,140 @@ def _parse_insert_blocks(sql_text: str, table: str) -> List[Dict]:
                 else:
                     parsed = parsed[: len(cols)]
             rows.append(dict(zip(cols, parsed)))
-    return rows
+    return result
+
+
+def _parse_insert_blocks(sql_bytes: bytes, table: str) -> List[Dict]:
+    """Extract INSERT blocks for a table and return list of dict rows."""
+    return _parse_inserts(sql_bytes, [table])[table]
+
+
+@njit(cache=True)
+def _grow(arr: np.ndarray) -> np.ndarray:
+    """Return a copy of `arr` with twice the capacity."""
+    out = np.empty(arr.shape[0] * 2, dtype=arr.dtype)
+    out[:arr.shape[0]] = arr
+    return out
+
+
+@njit(cache=True)
+def _scan_values(buf: Union[np.ndarray, bytes], start: int, end: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Tokenize the body of a VALUES clause held as bytes in ``buf[start:end]``.
+
+    ``buf`` is a uint8 array when numba compiles this function and plain ``bytes``
+    otherwise (indexing bytes is much cheaper than indexing numpy scalars in Python).
+    Returns ``(row_ends, field_starts, field_ends, field_quoted)``: byte offsets of each
+    raw field, whether it was quoted, and for each tuple the index one past its last
+    field. Quote and backslash-escape state is tracked so commas and parentheses
+    inside quoted strings stay part of the field. Output arrays start small and double
+    as needed, so memory follows the number of fields rather than the input size.
+    """
+    row_ends = np.empty(256, dtype=np.int64)
+    field_starts = np.empty(1024, dtype=np.int64)
+    field_ends = np.empty(1024, dtype=np.int64)
+    field_quoted = np.empty(1024, dtype=np.int8)
+    n_rows = 0
+    n_fields = 0
+    in_quote = False
+    escape = False
+    quoted = 0
+    depth = 0
+    field_start = start
+    for i in range(start, end):
+        ch = buf[i]
+        end_field = False
+        end_row = False
+        if in_quote:
+            if escape:
+                escape = False
+            elif ch == 92:  # backslash
+                escape = True
+            elif ch == 39:  # quote; '' re-enters the string on the next byte
+                in_quote = False
+        elif ch == 39:
+            in_quote = True
+            quoted = 1
+        elif ch == 40:  # (
+            depth += 1
+            if depth == 1:
+                field_start = i + 1
+                quoted = 0
+        elif ch == 41:  # )
+            depth -= 1
+            end_field = end_row = depth == 0
+        elif ch == 44 and depth == 1:  # ,
+            end_field = True
+
+        if end_field:
+            if n_fields == field_starts.shape[0]:
+                field_starts = _grow(field_starts)
+                field_ends = _grow(field_ends)
+                field_quoted = _grow(field_quoted)
+            field_starts[n_fields] = field_start
+            field_ends[n_fields] = i
+            field_quoted[n_fields] = quoted
+            n_fields += 1
+            field_start = i + 1
+            quoted = 0
+        if end_row:
+            if n_rows == row_ends.shape[0]:
+                row_ends = _grow(row_ends)
+            row_ends[n_rows] = n_fields
+            n_rows += 1
+    return row_ends[:n_rows], field_starts[:n_fields], field_ends[:n_fields], field_quoted[:n_fields]
+
+
+def _unquote_sql_string(token: str) -> str:
+    """Strip the surrounding quotes from a quoted SQL value and resolve its escapes."""
+    body = token[1:-1] if token.endswith("'") else token[1:]
+    if '\\' in body or "''" in body:
+        body = _ESCAPE_RE.sub(lambda m: "'" if m.group(1) is None else _SQL_ESCAPES.get(m.group(1), m.group(1)), body)
+    return body
 
 
 def _convert_sql_value(token: str):
     token = token.strip()
     if token.upper() == 'NULL' or token == '':
         return None
-    # if quoted string (csv already removed quotes) it will be raw string; try to parse numbers
-    # try int
-    try:
-        if re.fullmatch(r"-?\d+", token):
-            return int(token)
-        if re.fullmatch(r"-?\d+\.\d+", token):
-            return float(token)
-    except Exception:
-        pass
+    # quoted strings arrive with quotes already removed; try to parse numbers
+    if _INT_RE.fullmatch(token):
+        return int(token)
+    if _FLOAT_RE.fullmatch(token):
+        return float(token)
     # leave as string
     return token
 
 
+def _parse_table_inserts(sql_path: str, tables: List[str]) -> Dict[str, List[Dict]]:
+    """Return the INSERT rows of `tables` in the dump, parsed in a single pass.
+
+    Only the rows of the most recent request are kept per path, and they are reused while
+    the file's mtime and size are unchanged and the same (or fewer) tables are asked for.
+    """
+    st = os.stat(sql_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    entry = _SQL_ROWS_CACHE.get(sql_path)
+    if entry is not None and entry[0] == stamp and set(tables) <= entry[1].keys():
+        return entry[1]
+    # Read raw bytes: only the extracted field slices are ever decoded
+    with open(sql_path, 'rb') as f:
+        sql_bytes = f.read()
+    rows = _parse_inserts(sql_bytes, tables)
+    _SQL_ROWS_CACHE[sql_path] = (stamp, rows)
+    return rows
+
+
 def load_tables_from_sql(sql_path: str, tables: List[str]) -> Dict[str, pd.DataFrame]:
     """Load specified tables from a SQL dump and return DataFrames.
 
     This function only parses INSERT statements and does not rely on a live DB.
     It is tolerant of MySQL-specific DDL by only extracting the data rows.
     """
-    with open(sql_path, 'r', encoding='utf-8', errors='ignore') as f:
-        sql_text = f.read()
+    all_rows = _parse_table_inserts(sql_path, tables)
 
     result = {}
     for table in tables:
-        rows = _parse_insert_blocks(sql_text, table)
+        rows = all_rows.get(table)
         if not rows:
             # return empty DataFrame with no rows if table missing
             result[table] = pd.DataFrame()
@@ -69,9 +235,13 @@ def load_tables_from_sql(sql_path: str, tables: List[str]) -> Dict[str, pd.DataF
     return result
 
 
-def _load_state_mapping(sql_path: str, mapping_csv: Optional[str] = None, mapping_dict: Optional[Dict] = None) -> Dict[int, str]:
+def _load_state_mapping(sql_path: str, mapping_csv: Optional[str] = None, mapping_dict: Optional[Dict] = None,
+                        tables: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[int, str]:
     """Return a mapping from state_id -> state_name.
 
+    `tables` may hold already loaded 'state' and 'lga' tables; otherwise both are loaded
+    from `sql_path` together.
+
     Priority:
       1. mapping_dict param if provided
       2. mapping_csv path if provided (CSV with columns 'state_id','state_name')
@@ -84,10 +254,12 @@ def _load_state_mapping(sql_path: str, mapping_csv: Optional[str] = None, mappin
     if mapping_csv:
         df = pd.read_csv(mapping_csv)
         if 'state_id' in df.columns and 'state_name' in df.columns:
-            return {int(row['state_id']): row['state_name'] for _, row in df.iterrows()}
+            return dict(zip(df['state_id'].astype(int).tolist(), df['state_name']))
+
+    if tables is None:
+        tables = load_tables_from_sql(sql_path, ['state', 'lga'])
 
     # Try to parse a state table from SQL
-    tables = load_tables_from_sql(sql_path, ['state'])
     state_table = tables.get('state', pd.DataFrame())
     if not state_table.empty:
         # try to find state id/name columns
@@ -99,15 +271,13 @@ def _load_state_mapping(sql_path: str, mapping_csv: Optional[str] = None, mappin
             if 'name' in c.lower():
                 name_col = c
         if id_col and name_col:
-            return {int(r[id_col]): r[name_col] for _, r in state_table.iterrows()}
+            return dict(zip(state_table[id_col].astype(int).tolist(), state_table[name_col]))
 
     # Fallback: derive unique ids from lga table
-    tables = load_tables_from_sql(sql_path, ['lga'])
     lga = tables.get('lga', pd.DataFrame())
     mapping = {}
     if not lga.empty and 'state_id' in lga.columns:
-        for sid in sorted(lga['state_id'].dropna().unique()):
-            mapping[int(sid)] = f"State {int(sid)}"
+        mapping = {sid: f"State {sid}" for sid in np.sort(lga['state_id'].dropna().unique().astype(int)).tolist()}
 
     # Overrides for known state name fixes
     # Ensure state id 25 is correctly labeled as 'Delta State'
@@ -116,12 +286,55 @@ def _load_state_mapping(sql_path: str, mapping_csv: Optional[str] = None, mappin
     return mapping
 
 
+def _results_cache_stamp(sql_path: str) -> str:
+    """Return the stamp identifying the cache format and the SQL file version it was built from.
+
+    The file size is included because appends can land within the filesystem's mtime granularity.
+    """
+    st = os.stat(sql_path)
+    return f"{_RESULTS_CACHE_VERSION}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def _read_results_cache(sql_path: str, stamp: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """Return the cached results DataFrame if it was built from the current SQL file and cache version."""
+    try:
+        if stamp is None:
+            stamp = _results_cache_stamp(sql_path)
+        with open(sql_path + '.mtime', 'r', encoding='utf-8') as f:
+            if f.read().strip() != stamp:
+                return None
+        return pd.read_parquet(sql_path + '.parquet')
+    except (OSError, ImportError, ValueError):
+        return None
+
+
+def _write_results_cache(sql_path: str, df: pd.DataFrame, stamp: str) -> None:
+    """Persist `df` next to the SQL file, tagged with `stamp` as taken before the SQL was read."""
+    try:
+        df.to_parquet(sql_path + '.parquet', compression='zstd')
+        with open(sql_path + '.mtime', 'w', encoding='utf-8') as f:
+            f.write(stamp)
+    except (OSError, ImportError, ValueError):
+        # caching is best-effort; a missing parquet engine or read-only dir just means reparsing next time
+        pass
+
+
 def build_polling_unit_results_df(sql_path: str, state_mapping: Optional[Dict[int, str]] = None) -> pd.DataFrame:
     """Build a DataFrame where each row is a polling unit and columns are state, lga, ward and parties.
 
     Adds a `state_name` column using `state_mapping` if provided or by inferring from the SQL.
+    When no explicit mapping is given, the result is cached as `<sql_path>.parquet` and reused
+    for as long as the SQL file's mtime and size are unchanged.
     """
-    tables = load_tables_from_sql(sql_path, ['polling_unit', 'ward', 'lga', 'announced_pu_results'])
+    use_cache = state_mapping is None
+    if use_cache:
+        # Stamp before reading, so a dump modified mid-build is not recorded as current
+        stamp = _results_cache_stamp(sql_path)
+        cached = _read_results_cache(sql_path, stamp)
+        if cached is not None:
+            return cached
+
+    tables = load_tables_from_sql(sql_path, ['polling_unit', 'ward', 'lga', 'announced_pu_results', 'state'])
 
     pu = tables['polling_unit']
     ward = tables['ward']
@@ -139,96 +352,142 @@ def build_polling_unit_results_df(sql_path: str, state_mapping: Optional[Dict[in
         'party_score': 'party_score'
     })
 
-    announced['polling_unit_uniqueid'] = announced['polling_unit_uniqueid'].apply(lambda v: int(v) if v is not None else None)
+    # Nullable Int64 keeps missing ids as <NA> without falling back to object dtype
+    announced['polling_unit_uniqueid'] = pd.to_numeric(announced['polling_unit_uniqueid'], errors='coerce').astype('Int64')
 
-    party_pivot = announced.pivot_table(index='polling_unit_uniqueid',
-                                        columns='party_abbreviation',
-                                        values='party_score',
-                                        aggfunc='sum',
-                                        fill_value=0).reset_index()
+    announced['party_score'] = pd.to_numeric(announced['party_score'], downcast='integer')
+    # Plain groupby-sum + unstack skips pivot_table's generic margin/NaN machinery;
+    # the result stays indexed by polling_unit_uniqueid for the join below
+    party_pivot = (announced.groupby(['polling_unit_uniqueid', 'party_abbreviation'], sort=False)['party_score']
+                   .sum()
+                   .unstack('party_abbreviation', fill_value=0))
+    # groupby drops <NA> keys, so the index can go back to plain int64 and the
+    # joined output keeps an int64 polling_unit_uniqueid like the polling_unit table
+    party_pivot.index = party_pivot.index.astype('int64')
 
     pu = pu.rename(columns={'uniqueid': 'polling_unit_uniqueid',
                             'polling_unit_name': 'polling_unit_name',
                             'lga_id': 'lga_id',
                             'ward_id': 'ward_id'})
 
-    merged = pu.merge(party_pivot, on='polling_unit_uniqueid', how='left')
-
-    # merge ward and lga
+    # Left-join party scores, ward and lga onto the polling units by index
+    merged = pu.set_index('polling_unit_uniqueid').join(party_pivot)
     if not ward.empty and 'ward_id' in ward.columns and 'ward_name' in ward.columns:
-        merged = merged.merge(ward[['ward_id', 'ward_name']], on='ward_id', how='left')
+        merged = merged.join(ward.set_index('ward_id')[['ward_name']], on='ward_id')
     if not lga.empty and 'lga_id' in lga.columns and 'lga_name' in lga.columns:
-        merged = merged.merge(lga[['lga_id', 'lga_name', 'state_id']], on='lga_id', how='left')
+        merged = merged.join(lga.set_index('lga_id')[['lga_name', 'state_id']], on='lga_id')
+    merged = merged.reset_index()
 
     # State mapping
     if state_mapping is None:
-        state_mapping = _load_state_mapping(sql_path)
+        state_mapping = _load_state_mapping(sql_path, tables=tables)
     merged['state_name'] = merged['state_id'].map(state_mapping) if 'state_id' in merged.columns else None
 
     # Reorder columns and ensure party columns are ints
-    known = ['polling_unit_uniqueid', 'polling_unit_name', 'polling_unit_number', 'ward_id', 'lga_id', 'ward_name', 'lga_name', 'state_id', 'state_name']
+    known = _INFO_COLUMNS
     # Determine party columns from the pivot (safer than guessing from merged columns)
-    party_columns = [c for c in party_pivot.columns if c != 'polling_unit_uniqueid']
-    party_columns = [c for c in party_columns if c in merged.columns]
+    party_columns = [c for c in party_pivot.columns if c in merged.columns]
     final_cols = [c for c in known if c in merged.columns] + sorted(party_columns)
-    final_df = merged[final_cols].copy()
-    for c in party_columns:
-        final_df[c] = final_df[c].fillna(0).astype(int)
-
+    # Under copy-on-write reindex selects lazily; the columns are only copied as they get recast
+    final_df = merged.reindex(columns=final_cols)
+    if _NAME_DTYPE is not None:
+        name_cols = [c for c in ('polling_unit_name', 'polling_unit_number', 'ward_name', 'lga_name', 'state_name') if c in final_df.columns]
+        final_df[name_cols] = final_df[name_cols].astype(_NAME_DTYPE)
+    # Vote counts fit comfortably in int32, halving the memory the totals have to scan
+    final_df[party_columns] = final_df[party_columns].fillna(0).astype(np.int32)
+
+    if use_cache:
+        _write_results_cache(sql_path, final_df, stamp)
     return final_df
 
 
 # Helper functions for filtering and UI
 
-def append_polling_unit_to_sql(sql_path: str, pu_row: Dict) -> str:
-    """Append a new `polling_unit` INSERT statement to the SQL dump file.
+_POLLING_UNIT_SQL_COLUMNS = ['uniqueid', 'polling_unit_id', 'ward_id', 'lga_id', 'uniquewardid',
+                             'polling_unit_number', 'polling_unit_name', 'polling_unit_description',
+                             'lat', 'long', 'entered_by_user', 'date_entered', 'user_ip_address']
 
-    pu_row should contain keys for the main columns. Missing values will be written as NULL.
-    Returns the SQL statement that was written.
-    """
-    col_order = ['uniqueid', 'polling_unit_id', 'ward_id', 'lga_id', 'uniquewardid',
-                 'polling_unit_number', 'polling_unit_name', 'polling_unit_description',
-                 'lat', 'long', 'entered_by_user', 'date_entered', 'user_ip_address']
 
+def _format_polling_unit_insert(pu_row: Dict) -> str:
+    """Return the `polling_unit` INSERT statement (with trailing newline) for one row."""
     def _format_val(v):
         if v is None:
             return 'NULL'
         if isinstance(v, (int, float)):
             return str(int(v))
-        s = str(v).replace("'", "\\'")
+        # Backslashes first, so the scanner's MySQL escape handling reads the text back verbatim
+        s = str(v).replace('\\', '\\\\').replace("'", "\\'")
         return f"'{s}'"
 
-    values = [_format_val(pu_row.get(c)) for c in col_order]
-    stmt = f"INSERT INTO `polling_unit` (`{'`,`'.join(col_order)}`) VALUES ({', '.join(values)});\n"
+    values = [_format_val(pu_row.get(c)) for c in _POLLING_UNIT_SQL_COLUMNS]
+    return f"INSERT INTO `polling_unit` (`{'`,`'.join(_POLLING_UNIT_SQL_COLUMNS)}`) VALUES ({', '.join(values)});\n"
+
+
+def append_polling_units_to_sql(sql_path: str, pu_rows: List[Dict]) -> List[str]:
+    """Append one `polling_unit` INSERT statement per row to the SQL dump file.
+
+    The file is opened once and all statements are written in a single buffered write.
+    Missing values are written as NULL. Returns the SQL statements that were written.
+    """
+    stmts = [_format_polling_unit_insert(row) for row in pu_rows]
+    if stmts:
+        with open(sql_path, 'a', encoding='utf-8', buffering=64 * 1024) as f:
+            f.write(''.join(stmts))
+    return stmts
+
 
-    with open(sql_path, 'a', encoding='utf-8') as f:
-        f.write(stmt)
+def append_polling_unit_to_sql(sql_path: str, pu_row: Dict) -> str:
+    """Append a new `polling_unit` INSERT statement to the SQL dump file.
 
-    return stmt
+    pu_row should contain keys for the main columns. Missing values will be written as NULL.
+    Returns the SQL statement that was written.
+    """
+    return append_polling_units_to_sql(sql_path, [pu_row])[0]
 
 
 def add_polling_unit_to_df(df: pd.DataFrame, pu_row: Dict) -> pd.DataFrame:
     """Return a new DataFrame with the polling unit row appended.
 
-    Ensures party columns are present and set to 0 for the new row.
+    Party columns missing from `pu_row` (or given as None) are set to 0 for the new row.
+    The row is built with `df`'s dtypes, so the concat upcasts nothing that needs casting back.
     """
     new = {}
-    for col in df.columns:
-        if col in pu_row:
-            new[col] = pu_row[col]
-        elif col in ['polling_unit_uniqueid', 'polling_unit_name', 'polling_unit_number', 'ward_id', 'lga_id', 'ward_name', 'lga_name', 'state_id', 'state_name']:
-            new[col] = pu_row.get(col, None)
-        else:
+    for col, dtype in df.dtypes.items():
+        value = pu_row.get(col)
+        if value is None and col not in _INFO_COLUMNS:
             # party column
-            new[col] = 0
+            value = 0
+        try:
+            new[col] = pd.array([value], dtype=dtype)
+        except (TypeError, ValueError):
+            new[col] = [value]
+    return pd.concat([df, pd.DataFrame(new)], ignore_index=True)
+
+
+def get_party_columns(df: pd.DataFrame) -> List[str]:
+    """Return the party vote columns of a results DataFrame."""
+    return [c for c in df.columns if c not in _INFO_COLUMNS]
+
+
+def get_party_totals(df: pd.DataFrame) -> Dict[str, Tuple[pd.DataFrame, pd.Series]]:
+    """Return party vote totals and row counts grouped by each of 'state_id', 'lga_id' and 'ward_id'.
+
+    Each value is a `(totals, counts)` pair indexed by that id: `totals` has one column per
+    party and `counts` the number of polling unit rows, so both are a single `.loc` lookup
+    instead of a filter and sum over the location's polling units.
+    """
+    party_cols = get_party_columns(df)
+    result = {}
+    for col in ('state_id', 'lga_id', 'ward_id'):
+        if col in df.columns:
+            groups = df.groupby(col)
+            result[col] = (groups[party_cols].sum(), groups.size())
+    return result
 
-    new_df = pd.concat([df, pd.DataFrame([new])], ignore_index=True)
-    # Ensure party columns are ints
-    party_cols = [c for c in new_df.columns if c not in ['polling_unit_uniqueid', 'polling_unit_name', 'polling_unit_number', 'ward_id', 'lga_id', 'ward_name', 'lga_name', 'state_id', 'state_name']]
-    for c in party_cols:
-        new_df[c] = new_df[c].fillna(0).astype(int)
-    return new_df
 
+def get_name_map(pairs: List[Tuple[int, str]]) -> Dict[str, int]:
+    """Return a name -> id lookup for (id, name) pairs; the first id wins for repeated names."""
+    return {name: _id for _id, name in reversed(pairs)}
 
 
 def get_states(df: pd.DataFrame) -> List[Tuple[int, str]]:
@@ -264,7 +523,8 @@ def get_wards_by_lga(df: pd.DataFrame, lga_id: Optional[int] = None) -> List[Tup
 
 
 def filter_results(df: pd.DataFrame, state_id: Optional[int] = None, lga_id: Optional[int] = None, ward_id: Optional[int] = None, polling_unit_id: Optional[int] = None) -> pd.DataFrame:
-    out = df.copy()
+    # No up-front copy: each mask already selects a new frame (with no filters `df` itself is returned)
+    out = df
     if state_id is not None and 'state_id' in out.columns:
         out = out[out['state_id'] == int(state_id)]
     if lga_id is not None and 'lga_id' in out.columns:
@@ -1,3 +1,5 @@
+import numpy as np
+import pandas as pd
 import streamlit as st
 from data import (
     build_polling_unit_results_df,
@@ -5,7 +7,10 @@ from data import (
     get_lgas_by_state,
     get_wards_by_lga,
     filter_results,
-    append_polling_unit_to_sql,
+    get_party_columns,
+    get_party_totals,
+    get_name_map,
+    append_polling_units_to_sql,
     add_polling_unit_to_df,
 )
 
@@ -17,7 +22,40 @@ st.set_page_config(page_title="Bincom Survey", layout="centered")
 def load_data():
     return build_polling_unit_results_df("bincom_test.sql")
 
+
+@st.cache_data
+def load_party_totals(_df):
+    return get_party_totals(_df)
+
+
+# Dropdown options and their name -> id maps only change when DF does; the
+# underscore argument is not hashed, so call .clear() after modifying DF
+@st.cache_data
+def load_states(_df):
+    states = get_states(_df)
+    return states, get_name_map(states)
+
+
+@st.cache_data
+def load_lgas(_df, state_id=None):
+    lgas = get_lgas_by_state(_df, state_id=state_id)
+    return lgas, get_name_map(lgas)
+
+
+@st.cache_data
+def load_wards(_df, lga_id=None):
+    wards = get_wards_by_lga(_df, lga_id=lga_id)
+    return wards, get_name_map(wards)
+
+
+@st.cache_data
+def load_ward_pus(_df, lga_id, ward_id):
+    cols = ['polling_unit_uniqueid', 'polling_unit_name', 'polling_unit_number']
+    mask = (_df['lga_id'] == lga_id) & (_df['ward_id'] == ward_id)
+    return _df.loc[mask, cols].drop_duplicates().sort_values('polling_unit_name')
+
 DF = load_data()
+PARTY_TOTALS = load_party_totals(DF)
 
 
 def show_home():
@@ -51,78 +89,78 @@ def show_question_one():
         st.success(f"You selected: {st.session_state.q1_selection}")
 
         if st.session_state.q1_selection == "State":
-            states = get_states(DF)
+            states, state_ids = load_states(DF)
             if not states:
                 st.warning("No state information available")
                 return
             state_names = [name for (_id, name) in states]
             sel = st.selectbox("Choose a state", state_names)
-            sid = next(_id for _id, name in states if name == sel)
-            filtered = filter_results(DF, state_id=sid)
-            st.write(f"{len(filtered)} polling units in {sel}")
-            party_cols = [c for c in filtered.columns if c not in ['polling_unit_uniqueid','polling_unit_name','polling_unit_number','ward_id','lga_id','ward_name','lga_name','state_id','state_name']]
+            sid = state_ids[sel]
+            totals_by_id, counts_by_id = PARTY_TOTALS['state_id']
+            st.write(f"{int(counts_by_id.get(sid, 0))} polling units in {sel}")
+            party_cols = get_party_columns(DF)
             if party_cols:
-                totals = filtered[party_cols].sum().sort_values(ascending=False)
+                totals = totals_by_id.loc[sid].sort_values(ascending=False)
                 st.dataframe(totals.to_frame('votes'))
                 st.bar_chart(totals)
 
         elif st.session_state.q1_selection == "LGA":
-            lgas = get_lgas_by_state(DF)
+            lgas, lga_ids = load_lgas(DF)
             if not lgas:
                 st.warning("No LGA data available")
                 return
             lga_names = [name for (_id, name) in lgas]
             sel = st.selectbox("Choose an LGA", lga_names)
-            lid = next(_id for _id, name in lgas if name == sel)
-            filtered = filter_results(DF, lga_id=lid)
-            st.write(f"{len(filtered)} polling units in {sel}")
-            party_cols = [c for c in filtered.columns if c not in ['polling_unit_uniqueid','polling_unit_name','polling_unit_number','ward_id','lga_id','ward_name','lga_name','state_id','state_name']]
+            lid = lga_ids[sel]
+            totals_by_id, counts_by_id = PARTY_TOTALS['lga_id']
+            st.write(f"{int(counts_by_id.get(lid, 0))} polling units in {sel}")
+            party_cols = get_party_columns(DF)
             if party_cols:
-                totals = filtered[party_cols].sum().sort_values(ascending=False)
+                totals = totals_by_id.loc[lid].sort_values(ascending=False)
                 st.dataframe(totals.to_frame('votes'))
                 st.bar_chart(totals)
 
         elif st.session_state.q1_selection == "Ward":
             # First select an LGA so wards are scoped to that LGA
-            lgas = get_lgas_by_state(DF)
+            lgas, lga_ids = load_lgas(DF)
             if not lgas:
                 st.warning("No LGA data available")
                 return
             lga_names = [name for (_id, name) in lgas]
             sel_lga = st.selectbox("Choose an LGA", lga_names, key="q1_ward_lga")
-            lid = next(_id for _id, name in lgas if name == sel_lga)
+            lid = lga_ids[sel_lga]
 
-            wards = get_wards_by_lga(DF, lga_id=lid)
+            wards, ward_ids = load_wards(DF, lga_id=lid)
             if not wards:
                 st.warning("No wards found for selected LGA")
                 return
             ward_names = [name for (_id, name) in wards]
             sel = st.selectbox("Choose a ward", ward_names, key="q1_ward")
-            wid = next(_id for _id, name in wards if name == sel)
-            filtered = filter_results(DF, ward_id=wid)
-            st.write(f"{len(filtered)} polling units in {sel}")
-            party_cols = [c for c in filtered.columns if c not in ['polling_unit_uniqueid','polling_unit_name','polling_unit_number','ward_id','lga_id','ward_name','lga_name','state_id','state_name']]
+            wid = ward_ids[sel]
+            totals_by_id, counts_by_id = PARTY_TOTALS['ward_id']
+            st.write(f"{int(counts_by_id.get(wid, 0))} polling units in {sel}")
+            party_cols = get_party_columns(DF)
             if party_cols:
-                totals = filtered[party_cols].sum().sort_values(ascending=False)
+                totals = totals_by_id.loc[wid].sort_values(ascending=False)
                 st.dataframe(totals.to_frame('votes'))
                 st.bar_chart(totals)
 
         elif st.session_state.q1_selection == "Polling Unit":
             # Scope polling units by LGA then by Ward to make selection easier
-            lgas = get_lgas_by_state(DF)
+            lgas, lga_ids = load_lgas(DF)
             if not lgas:
                 st.warning("No LGA data available")
                 return
             lga_names = [name for (_id, name) in lgas]
             sel_lga = st.selectbox("Choose an LGA", lga_names, key="q1_pu_lga")
-            lid = next(_id for _id, name in lgas if name == sel_lga)
+            lid = lga_ids[sel_lga]
 
-            wards = get_wards_by_lga(DF, lga_id=lid)
+            wards, ward_ids = load_wards(DF, lga_id=lid)
             if wards:
                 ward_names = [name for (_id, name) in wards]
                 sel_ward = st.selectbox("Choose a Ward (optional)", ["All Wards"] + ward_names, key="q1_pu_ward")
                 if sel_ward != "All Wards":
-                    wid = next(_id for _id, name in wards if name == sel_ward)
+                    wid = ward_ids[sel_ward]
                     pus = DF[(DF['lga_id'] == lid) & (DF['ward_id'] == wid)][['polling_unit_uniqueid','polling_unit_name']].drop_duplicates().sort_values('polling_unit_name')
                 else:
                     pus = DF[DF['lga_id'] == lid][['polling_unit_uniqueid','polling_unit_name']].drop_duplicates().sort_values('polling_unit_name')
@@ -137,9 +175,11 @@ def show_question_one():
             pu_id = int(pus[pus['polling_unit_name'] == sel_name]['polling_unit_uniqueid'].iloc[0])
             filtered = filter_results(DF, polling_unit_id=pu_id)
             st.write(f"Results for {sel_name} (PU id {pu_id})")
-            party_cols = [c for c in filtered.columns if c not in ['polling_unit_uniqueid','polling_unit_name','polling_unit_number','ward_id','lga_id','ward_name','lga_name','state_id','state_name']]
+            party_cols = get_party_columns(DF)
             if party_cols:
-                totals = filtered[party_cols].sum().sort_values(ascending=False)
+                # Reduce the int32 vote block directly in NumPy rather than through DataFrame.sum
+                votes = filtered[party_cols].to_numpy(copy=False)
+                totals = pd.Series(np.add.reduce(votes, axis=0), index=party_cols).sort_values(ascending=False)
                 st.dataframe(totals.to_frame('votes'))
                 st.bar_chart(totals)
 
@@ -162,28 +202,28 @@ def show_question_two():
         st.success(f"You selected: {st.session_state.q2_selection}")
 
         if st.session_state.q2_selection == "State":
-            states = get_states(DF)
+            states, state_ids = load_states(DF)
             state_names = [name for (_id, name) in states]
             sel = st.selectbox("Choose a state", state_names, key="q2_state")
-            sid = next(_id for _id, name in states if name == sel)
-            filtered = filter_results(DF, state_id=sid)
-            st.write(f"Summed results for {sel} across {len(filtered)} polling units")
-            party_cols = [c for c in filtered.columns if c not in ['polling_unit_uniqueid','polling_unit_name','polling_unit_number','ward_id','lga_id','ward_name','lga_name','state_id','state_name']]
+            sid = state_ids[sel]
+            totals_by_id, counts_by_id = PARTY_TOTALS['state_id']
+            st.write(f"Summed results for {sel} across {int(counts_by_id.get(sid, 0))} polling units")
+            party_cols = get_party_columns(DF)
             if party_cols:
-                totals = filtered[party_cols].sum().sort_values(ascending=False)
+                totals = totals_by_id.loc[sid].sort_values(ascending=False)
                 st.dataframe(totals.to_frame('votes'))
                 st.bar_chart(totals)
 
         elif st.session_state.q2_selection == "LGA":
-            lgas = get_lgas_by_state(DF)
+            lgas, lga_ids = load_lgas(DF)
             lga_names = [name for (_id, name) in lgas]
             sel = st.selectbox("Choose an LGA", lga_names, key="q2_lga")
-            lid = next(_id for _id, name in lgas if name == sel)
-            filtered = filter_results(DF, lga_id=lid)
-            st.write(f"Summed results for {sel} across {len(filtered)} polling units")
-            party_cols = [c for c in filtered.columns if c not in ['polling_unit_uniqueid','polling_unit_name','polling_unit_number','ward_id','lga_id','ward_name','lga_name','state_id','state_name']]
+            lid = lga_ids[sel]
+            totals_by_id, counts_by_id = PARTY_TOTALS['lga_id']
+            st.write(f"Summed results for {sel} across {int(counts_by_id.get(lid, 0))} polling units")
+            party_cols = get_party_columns(DF)
             if party_cols:
-                totals = filtered[party_cols].sum().sort_values(ascending=False)
+                totals = totals_by_id.loc[lid].sort_values(ascending=False)
                 st.dataframe(totals.to_frame('votes'))
                 st.bar_chart(totals)
 
@@ -194,43 +234,48 @@ def show_question_three():
 
     global DF
 
-    states = get_states(DF)
+    # Polling units added this session but not yet written to the SQL dump
+    if "pu_buffer" not in st.session_state:
+        st.session_state.pu_buffer = []
+
+    states, state_ids = load_states(DF)
     if not states:
         st.warning("No state/LGA/ward data available to add polling units.")
         return
 
     state_names = [name for (_id, name) in states]
     selected_state = st.selectbox("State", state_names)
-    state_id = next(_id for _id, name in states if name == selected_state)
+    state_id = state_ids[selected_state]
 
-    lgas = get_lgas_by_state(DF, state_id=state_id)
+    lgas, lga_ids = load_lgas(DF, state_id=state_id)
     if not lgas:
         st.warning("No LGAs found for selected state")
         return
     lga_names = [name for (_id, name) in lgas]
     selected_lga = st.selectbox("LGA", lga_names)
-    lga_id = next(_id for _id, name in lgas if name == selected_lga)
+    lga_id = lga_ids[selected_lga]
 
-    wards = get_wards_by_lga(DF, lga_id=lga_id)
+    wards, ward_ids = load_wards(DF, lga_id=lga_id)
     if not wards:
         st.warning("No wards found for selected LGA")
         return
     ward_names = [name for (_id, name) in wards]
     selected_ward = st.selectbox("Ward", ward_names)
-    ward_id = next(_id for _id, name in wards if name == selected_ward)
+    ward_id = ward_ids[selected_ward]
 
     pu_name = st.text_input("Polling Unit Name")
     pu_number = st.text_input("Polling Unit Number (optional)")
 
     # Show existing polling units for this (LGA, Ward) to avoid duplicates
-    existing_pus = DF[(DF['lga_id'] == lga_id) & (DF['ward_id'] == ward_id)][['polling_unit_uniqueid', 'polling_unit_name', 'polling_unit_number']].drop_duplicates().sort_values('polling_unit_name')
+    existing_pus = load_ward_pus(DF, lga_id, ward_id)
     if not existing_pus.empty:
         st.markdown(f"**Existing polling units in {selected_ward}, {selected_lga} ({len(existing_pus)})**")
         st.dataframe(existing_pus.reset_index(drop=True))
 
     if st.button("Add Polling Unit"):
-        # Create new unique id
+        # Create new unique id, skipping ids already taken by unsaved polling units
         max_id = int(DF['polling_unit_uniqueid'].max()) if not DF['polling_unit_uniqueid'].isnull().all() else 0
+        max_id = max([max_id] + [row['uniqueid'] for row in st.session_state.pu_buffer])
         new_uid = max_id + 1
 
         # If user supplied a polling unit number, ensure it's unique within this ward/lga
@@ -272,23 +317,33 @@ def show_question_three():
             'state_name': selected_state,
         }
 
-        # Append to SQL file
-        sql_path = 'bincom_test.sql'
-        try:
-            stmt = append_polling_unit_to_sql(sql_path, pu_row)
-        except Exception as e:
-            st.error(f"Failed to write to SQL file: {e}")
-            return
-
         # Update in-memory DF
         try:
             DF = add_polling_unit_to_df(DF, pu_row)
         except Exception as e:
             st.error(f"Failed to add polling unit to dataframe: {e}")
             return
-
-        st.success(f"Polling unit '{pu_row['polling_unit_name']}' added (id={new_uid}).")
-        st.code(stmt)
+        load_states.clear()
+        load_lgas.clear()
+        load_wards.clear()
+        load_ward_pus.clear()
+        load_party_totals.clear()
+
+        # Queue for the SQL file; written on "Save" so many adds share one write
+        st.session_state.pu_buffer.append(pu_row)
+        st.success(f"Polling unit '{pu_row['polling_unit_name']}' added (id={new_uid}). Save to write it to the SQL file.")
+
+    pending = len(st.session_state.pu_buffer)
+    if pending and st.button(f"Save {pending} polling unit(s) to SQL file"):
+        sql_path = 'bincom_test.sql'
+        try:
+            stmts = append_polling_units_to_sql(sql_path, st.session_state.pu_buffer)
+        except Exception as e:
+            st.error(f"Failed to write to SQL file: {e}")
+            return
+        st.session_state.pu_buffer = []
+        st.success(f"Saved {len(stmts)} polling unit(s) to {sql_path}.")
+        st.code(''.join(stmts))
 
 
 def main():
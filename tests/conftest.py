@@ -1,7 +1,23 @@
 import sys
+import shutil
 import pathlib
 
+import pytest
+
 # Ensure the repository root is on sys.path so tests can import project modules
 ROOT = pathlib.Path(__file__).parent.parent.resolve()
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(scope='session')
+def df(tmp_path_factory):
+    """Results DataFrame built once from the bundled SQL dump and shared by all tests.
+
+    The dump is copied to a temporary directory first, so the build always runs the
+    current parser and its Parquet cache never lands in (or is read from) the repo.
+    """
+    from data import build_polling_unit_results_df
+    sql_path = tmp_path_factory.mktemp('sql') / 'bincom_test.sql'
+    shutil.copy(ROOT / 'bincom_test.sql', sql_path)
+    return build_polling_unit_results_df(str(sql_path))
@@ -1,33 +1,86 @@
-import pytest
-from data import build_polling_unit_results_df, get_lgas_by_state, get_wards_by_lga, filter_results
+from data import get_lgas_by_state, get_wards_by_lga, filter_results, get_party_columns, get_party_totals, add_polling_unit_to_df
 
-DF = build_polling_unit_results_df('bincom_test.sql')
 
-
-def test_lga_and_ward_filtering():
-    lgas = get_lgas_by_state(DF)
+def test_lga_and_ward_filtering(df):
+    lgas = get_lgas_by_state(df)
     assert any('Aniocha' in name for (_id, name) in lgas)
 
     lid = next(_id for _id, name in lgas if 'Aniocha North' in name)
-    wards = get_wards_by_lga(DF, lga_id=lid)
+    wards = get_wards_by_lga(df, lga_id=lid)
     assert len(wards) > 0
 
     wid = wards[0][0]
-    filtered = filter_results(DF, ward_id=wid)
+    filtered = filter_results(df, ward_id=wid)
     assert not filtered.empty
 
 
-def test_polling_unit_scoping():
-    lgas = get_lgas_by_state(DF)
+def test_polling_unit_scoping(df):
+    lgas = get_lgas_by_state(df)
     lid = next(_id for _id, name in lgas if 'Aniocha' in name)
 
-    wards = get_wards_by_lga(DF, lga_id=lid)
+    wards = get_wards_by_lga(df, lga_id=lid)
     assert len(wards) > 0
     wid = wards[0][0]
 
-    pus = DF[(DF['lga_id'] == lid) & (DF['ward_id'] == wid)][['polling_unit_uniqueid', 'polling_unit_name']].drop_duplicates()
+    pus = df[(df['lga_id'] == lid) & (df['ward_id'] == wid)][['polling_unit_uniqueid', 'polling_unit_name']].drop_duplicates()
     assert not pus.empty
 
     pu_id = int(pus['polling_unit_uniqueid'].iloc[0])
-    filtered = filter_results(DF, polling_unit_id=pu_id)
+    filtered = filter_results(df, polling_unit_id=pu_id)
     assert not filtered.empty
+
+
+def test_filter_results_matches_boolean_masks(df):
+    cases = [
+        {'state_id': 25},
+        {'lga_id': 17},
+        {'lga_id': 17, 'ward_id': 8},
+        {'polling_unit_id': int(df['polling_unit_uniqueid'].iloc[0])},
+        {'lga_id': 999999},
+    ]
+    columns = {'state_id': 'state_id', 'lga_id': 'lga_id', 'ward_id': 'ward_id', 'polling_unit_id': 'polling_unit_uniqueid'}
+    for kwargs in cases:
+        expected = df
+        for arg, value in kwargs.items():
+            expected = expected[expected[columns[arg]] == value]
+        result = filter_results(df, **kwargs)
+        assert result.index.equals(expected.index)
+        assert sorted(result['polling_unit_uniqueid'].tolist()) == sorted(expected['polling_unit_uniqueid'].tolist())
+
+
+def test_filter_results_sees_mutations(df):
+    mutated = df.copy()
+    moved = int((mutated['lga_id'] == 17).sum())
+    assert len(filter_results(mutated, lga_id=17)) == moved
+
+    mutated.loc[mutated['lga_id'] == 17, 'lga_id'] = 555
+    assert len(filter_results(mutated, lga_id=555)) == moved
+    assert filter_results(mutated, lga_id=17).empty
+
+
+def test_party_totals_match_filtered_sums(df):
+    totals = get_party_totals(df)
+    party_cols = get_party_columns(df)
+    lid = get_lgas_by_state(df)[0][0]
+    expected = filter_results(df, lga_id=lid)[party_cols].sum()
+    lga_totals, lga_counts = totals['lga_id']
+    assert lga_totals.loc[lid].tolist() == expected.tolist()
+    assert lga_counts.loc[lid] == len(filter_results(df, lga_id=lid))
+
+
+def test_add_polling_unit_keeps_dtypes(df):
+    n_rows = len(df)
+    new_uid = int(df['polling_unit_uniqueid'].max()) + 1
+
+    out = add_polling_unit_to_df(df, {'polling_unit_uniqueid': new_uid, 'polling_unit_name': 'New PU', 'lga_id': 17, 'ward_id': 8})
+    assert len(df) == n_rows
+    assert len(out) == n_rows + 1
+    assert (out.dtypes == df.dtypes).all()
+    assert len(filter_results(out, polling_unit_id=new_uid)) == 1
+
+
+def test_output_dtypes(df):
+    assert df['polling_unit_uniqueid'].dtype == 'int64'
+    assert df['ward_id'].dtype == 'int64'
+    assert df['lga_id'].dtype == 'int64'
+    assert (df[get_party_columns(df)].dtypes == 'int32').all()
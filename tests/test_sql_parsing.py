@@ -0,0 +1,119 @@
+import os
+import pathlib
+import shutil
+
+import pandas as pd
+import pytest
+
+import data
+from data import _parse_insert_blocks, append_polling_units_to_sql, build_polling_unit_results_df, load_tables_from_sql
+
+
+SQL_DUMP = pathlib.Path(__file__).parent.parent / 'bincom_test.sql'
+
+SQL = b"""
+INSERT INTO `ward` (`uniqueid`, `ward_id`, `ward_name`, `lga_id`) VALUES
+(1, 7, 'Ihuozomor ( Ozanogogo Alisimie )', 3),
+(2, 8, 'Ward, with comma', NULL),
+(3, 9, 'O\\'Neil''s', -4);
+"""
+
+
+def test_quoted_parens_commas_and_escapes():
+    rows = _parse_insert_blocks(SQL, 'ward')
+    assert [r['ward_name'] for r in rows] == ['Ihuozomor ( Ozanogogo Alisimie )', 'Ward, with comma', "O'Neil's"]
+    assert rows[1]['lga_id'] is None
+    assert rows[2]['lga_id'] == -4
+
+
+def test_missing_table_returns_no_rows():
+    assert _parse_insert_blocks(SQL, 'lga') == []
+
+
+def test_results_cache_tracks_sql_mtime(tmp_path):
+    pytest.importorskip('pyarrow')
+    sql_path = tmp_path / 'dump.sql'
+    shutil.copy(SQL_DUMP, sql_path)
+
+    built = build_polling_unit_results_df(str(sql_path))
+    assert (tmp_path / 'dump.sql.parquet').exists()
+    pd.testing.assert_frame_equal(build_polling_unit_results_df(str(sql_path)), built)
+
+    # A stale mtime stamp invalidates the cache
+    (tmp_path / 'dump.sql.mtime').write_text(f'{data._RESULTS_CACHE_VERSION}:0:0')
+    assert data._read_results_cache(str(sql_path)) is None
+
+
+def test_results_cache_not_stamped_current_if_dump_changes_mid_build(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    sql_path = tmp_path / 'dump.sql'
+    shutil.copy(SQL_DUMP, sql_path)
+
+    load_tables = data.load_tables_from_sql
+
+    def load_then_append(path, tables):
+        result = load_tables(path, tables)
+        append_polling_units_to_sql(path, [{'uniqueid': 90001, 'ward_id': 8, 'lga_id': 17}])
+        return result
+
+    monkeypatch.setattr(data, 'load_tables_from_sql', load_then_append)
+    build_polling_unit_results_df(str(sql_path))
+    assert data._read_results_cache(str(sql_path)) is None
+
+
+def test_results_cache_misses_on_version_change(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    sql_path = tmp_path / 'dump.sql'
+    shutil.copy(SQL_DUMP, sql_path)
+
+    build_polling_unit_results_df(str(sql_path))
+    assert data._read_results_cache(str(sql_path)) is not None
+
+    # A cache written by a different version of the build code must not be served
+    monkeypatch.setattr(data, '_RESULTS_CACHE_VERSION', data._RESULTS_CACHE_VERSION + 1)
+    assert data._read_results_cache(str(sql_path)) is None
+
+
+def test_appended_polling_units_round_trip(tmp_path):
+    sql_path = tmp_path / 'dump.sql'
+    shutil.copy(SQL_DUMP, sql_path)
+
+    stmts = append_polling_units_to_sql(str(sql_path), [
+        {'uniqueid': 90001, 'ward_id': 8, 'lga_id': 17, 'polling_unit_name': "St. Mary's (Annex)"},
+        {'uniqueid': 90002, 'ward_id': 8, 'lga_id': 17, 'polling_unit_name': 'Second'},
+    ])
+    assert len(stmts) == 2
+
+    pu = load_tables_from_sql(str(sql_path), ['polling_unit'])['polling_unit']
+    added = pu[pu['uniqueid'] >= 90001]
+    assert added['polling_unit_name'].tolist() == ["St. Mary's (Annex)", 'Second']
+
+
+def test_appended_backslashes_round_trip(tmp_path):
+    sql_path = tmp_path / 'dump.sql'
+    shutil.copy(SQL_DUMP, sql_path)
+
+    names = ['Block C\\', 'Path\\new', "O\\'Brien"]
+    append_polling_units_to_sql(str(sql_path), [
+        {'uniqueid': 90001 + i, 'ward_id': 8, 'lga_id': 17, 'polling_unit_name': name} for i, name in enumerate(names)
+    ])
+
+    pu = load_tables_from_sql(str(sql_path), ['polling_unit'])['polling_unit']
+    added = pu[pu['uniqueid'] >= 90001].sort_values('uniqueid')
+    assert added['uniqueid'].tolist() == [90001, 90002, 90003]
+    assert added['polling_unit_name'].tolist() == names
+
+
+def test_rows_cache_keeps_requested_tables_and_tracks_size(tmp_path):
+    sql_path = tmp_path / 'dump.sql'
+    shutil.copy(SQL_DUMP, sql_path)
+
+    load_tables_from_sql(str(sql_path), ['polling_unit'])
+    assert set(data._SQL_ROWS_CACHE[str(sql_path)][1]) == {'polling_unit'}
+
+    # An append that leaves the mtime unchanged is still picked up through the size
+    st = sql_path.stat()
+    append_polling_units_to_sql(str(sql_path), [{'uniqueid': 90001, 'ward_id': 8, 'lga_id': 17}])
+    os.utime(sql_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    pu = load_tables_from_sql(str(sql_path), ['polling_unit'])['polling_unit']
+    assert 90001 in pu['uniqueid'].tolist()